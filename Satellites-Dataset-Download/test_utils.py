@@ -0,0 +1,98 @@
+import time
+
+import pytest
+
+# utils imports these at module level, the tests below do not call them
+pytest.importorskip('ee')
+pytest.importorskip('pyproj')
+pytest.importorskip('shapely')
+
+import utils
+
+
+###################################################################################################################################################
+
+
+@pytest.fixture
+def stats_cache(tmp_path):
+  return utils.StatsCache(path=str(tmp_path / 'cache' / 'stats.sqlite'), ttl_days=30)
+
+
+def test_stats_cache_get_put(stats_cache):
+  key = stats_cache.make_key('MODIS/061/MOD09A1', '2020-01-01', '2020-12-31', 41.5, -93.6, 100, 2000, 'sur_refl_b01')
+  assert stats_cache.get(key) is None
+
+  stats_cache.put(key, -100.0, 5000.0)
+  assert stats_cache.get(key) == (-100.0, 5000.0)
+
+
+def test_stats_cache_keys(stats_cache):
+  key = stats_cache.make_key('MODIS/061/MOD09A1', '2020-01-01', '2020-12-31', 41.5, -93.6, 100, 2000, 'sur_refl_b01')
+  # centers are rounded to 5 decimals, the other fields are part of the key
+  assert key == stats_cache.make_key('MODIS/061/MOD09A1', '2020-01-01', '2020-12-31', 41.500001, -93.6, 100, 2000, 'sur_refl_b01')
+  assert key != stats_cache.make_key('MODIS/061/MOD09A1', '2020-01-01', '2020-12-31', 41.5, -93.6, 100, 500, 'sur_refl_b01')
+  assert key != stats_cache.make_key('MODIS/061/MOD09A1', '2020-01-01', '2020-12-31', 41.5, -93.6, 100, 2000, 'sur_refl_b02')
+
+
+def test_stats_cache_ttl(stats_cache, monkeypatch):
+  key = stats_cache.make_key('MODIS/061/MOD09A1', '2020-01-01', '2020-12-31', 41.5, -93.6, 100, 2000, 'sur_refl_b01')
+  stats_cache.put(key, -100.0, 5000.0)
+
+  now = time.time()
+  monkeypatch.setattr(utils.time, 'time', lambda: now + 29 * 24 * 60 * 60)
+  assert stats_cache.get(key) == (-100.0, 5000.0)
+
+  monkeypatch.setattr(utils.time, 'time', lambda: now + 31 * 24 * 60 * 60)
+  assert stats_cache.get(key) is None
+
+
+def test_stats_cache_skips_missing_values(stats_cache):
+  key = stats_cache.make_key('MODIS/061/MOD09A1', '2020-01-01', '2020-12-31', 41.5, -93.6, 100, 2000, 'sur_refl_b01')
+  # a band without valid pixels has None min/max values
+  stats_cache.put(key, None, None)
+  assert stats_cache.get(key) is None
+
+  # rows with NULL values (e.g. written by an older version) are misses
+  with utils.closing(stats_cache._connect()) as conn, conn:
+    conn.execute('INSERT OR REPLACE INTO stats VALUES (?, ?, ?, ?)', (key, None, None, time.time()))
+  assert stats_cache.get(key) is None
+
+
+###################################################################################################################################################
+
+
+def test_rate_limited():
+  call_times = []
+  limited = utils.rate_limited(calls=3, period=0.2)(lambda: call_times.append(time.monotonic()))
+
+  start = time.monotonic()
+  for _ in range(7):
+    limited()
+
+  # the calls are released in batches of 3 per period
+  offsets = [call_time - start for call_time in call_times]
+  assert all(offset < 0.1 for offset in offsets[:3])
+  assert all(0.2 <= offset < 0.3 for offset in offsets[3:6])
+  assert 0.4 <= offsets[6] < 0.5
+
+
+class DummyTask:
+  def __init__(self):
+    self.started = False
+
+  def start(self):
+    self.started = True
+
+
+def test_start_multiple_tasks():
+  tasks = [DummyTask() for _ in range(5)]
+
+  started, remaining = utils.start_multiple_tasks(tasks, 3)
+
+  assert started == tasks[:3]
+  assert remaining == tasks[3:]
+  assert all(task.started for task in started)
+  assert not any(task.started for task in remaining)
+
+  # no tasks to be started
+  assert utils.start_multiple_tasks([], 3) == ([], [])
@@ -3,10 +3,18 @@ import ee
 
 import os
 import time
-
-import pyproj
+import sqlite3
+import hashlib
+import asyncio
+import threading
+from collections import deque
+from contextlib import closing
+from itertools import chain
+from concurrent.futures import ThreadPoolExecutor
+
+from pyproj import Transformer
 from shapely.geometry import Point, mapping
-from functools import partial
+from functools import lru_cache, wraps
 from shapely.ops import transform
 
 
@@ -20,10 +28,8 @@ def getQABits(image, start, end, newName):
       - end:           end bit of interest in the QA flag 
       - newName:       the new name of the selected bits image
   '''
-  # Compute the bits we need to extract.
-  pattern = 0
-  for i in range(start, end):
-      pattern += 2**i
+  # Compute the bits we need to extract (bits start..end-1 set).
+  pattern = ((1 << (end - start)) - 1) << start
   
   # Return a single band image of the extracted QA bits, giving the band a new name.
   return image.select([0], [newName])\
@@ -52,41 +58,115 @@ def maskCloud(image):
 ###################################################################################################################################################
 
 
-def norm_band(imgcoll, band, polygon):
+class StatsCache:
   '''
-  a function to normalize a band of ee.ImageCollection using this formula ((x-min)/(max-min)), then re-scale it to be (0~255)
+  a persistent on-disk (SQLite) cache of the per-band min/max values used by norm_bands, so re-runs skip the reduceRegion calls
   Inputs:
-      - imgcoll:        ee.ImageCollection to normalize the band from
-      - band:           the band name to be normalized (in-place)
-      - polygon:        ee.Geometry.Polygon to be exported  
+      - path:           path of the SQLite database file
+      - ttl_days:       number of days after which a cached row is considered stale
   '''
+  def __init__(self, path=os.path.join(os.path.expanduser('~'), '.cache', 'gee_yield', 'stats.sqlite'), ttl_days=30):
+    self.path = path
+    self.ttl = ttl_days * 24 * 60 * 60
+    # writes are serialized so the cache can be shared between threads (see get_all_loc_tasks)
+    self._lock = threading.Lock()
+    os.makedirs(os.path.dirname(self.path), exist_ok=True)
+    with closing(self._connect()) as conn, conn:
+      conn.execute('PRAGMA journal_mode=WAL')
+      conn.execute('CREATE TABLE IF NOT EXISTS stats (key TEXT PRIMARY KEY, min REAL, max REAL, created REAL)')
+
+  def _connect(self):
+    return sqlite3.connect(self.path)
+
+  @staticmethod
+  def make_key(sat, start_date, end_date, lat, lon, polygon_area, norm_scale, band):
+    '''
+    a function to build the cache key of a band's min/max values for a specific satellite, period, polygon and reduction scale
+    '''
+    key = (sat, start_date, end_date, round(lat, 5), round(lon, 5), polygon_area, norm_scale, band)
+    return hashlib.sha1(repr(key).encode()).hexdigest()
+
+  def get(self, key):
+    '''
+    returns the cached (min, max) tuple of the key, or None if it is missing, stale or has no values
+    '''
+    with closing(self._connect()) as conn:
+      row = conn.execute('SELECT min, max FROM stats WHERE key = ? AND created >= ? AND min IS NOT NULL AND max IS NOT NULL', (key, time.time() - self.ttl)).fetchone()
+    return row
+
+  def put(self, key, min_value, max_value):
+    '''
+    stores the (min, max) values of the key, values of bands without valid pixels (None) are not cached
+    '''
+    if min_value is None or max_value is None:
+      return
+    with self._lock, closing(self._connect()) as conn, conn:
+      conn.execute('INSERT OR REPLACE INTO stats VALUES (?, ?, ?, ?)', (key, min_value, max_value, time.time()))
+
+
+###################################################################################################################################################
+
 
-  # select the band to be normalized
-  colIm = imgcoll.select(band)
+def norm_bands(imgcoll, bands, polygon, stats_cache=None, cache_key=None, norm_scale=2000):
+  '''
+  a function to normalize bands of ee.ImageCollection using this formula ((x-min)/(max-min)), then re-scale them to be (0~255)
+  the min/max values of all bands are computed by a single reduceRegion call, and all bands are normalized together as an array image
+  returns an ee.ImageCollection of the normalized (UINT8) bands only
+  Inputs:
+      - imgcoll:        ee.ImageCollection to normalize the bands from
+      - bands:          a list of the band names to be normalized
+      - polygon:        ee.Geometry.Polygon to be exported  
+      - stats_cache:    optional StatsCache to read/store the min/max values of the bands
+      - cache_key:      tuple of (sat, start_date, end_date, lat, lon, polygon_area) identifying the collection, required with stats_cache
+      - norm_scale:     scale (in meters) of the min/max reduction, coarser is faster but less precise
+  '''
 
-  # get the min/max values of the band in the image collection 
-  minImage=colIm.min()
-  maxImage=colIm.max()
-  maxValue = ee.Number(maxImage.reduceRegion(**{
-    'reducer': ee.Reducer.max(),
-    'geometry': polygon,
-    'maxPixels':10e10,
-    'scale': 500
-    }).get(band))
-  minValue = ee.Number(minImage.reduceRegion(**{
-    'reducer' : ee.Reducer.min(),
-    'geometry' : polygon,
-    'maxPixels' : 10e10,
-    'scale' : 500
-    }).get(band))
+  if stats_cache is not None:
+    keys = {band: stats_cache.make_key(*cache_key, norm_scale, band) for band in bands}
+    cached = {band: stats_cache.get(keys[band]) for band in bands}
+  else:
+    cached = {band: None for band in bands}
+
+  if any(value is None for value in cached.values()):
+    # per-pixel min/max of every band over the image collection (named <band>_min and <band>_max)
+    stats_image = imgcoll.select(bands).reduce(ee.Reducer.minMax())
+
+    # get the min/max values of all bands over the polygon in one call (named <band>_min_min and <band>_max_max)
+    # the min/max are stable at coarse scales, so reduce at norm_scale with bestEffort instead of every 500m pixel
+    stats = stats_image.reduceRegion(**{
+      'reducer': ee.Reducer.minMax(),
+      'geometry': polygon,
+      'scale': norm_scale,
+      'bestEffort': True,
+      'maxPixels': 1e8,
+      'tileScale': 4
+      })
+
+    if stats_cache is not None:
+      # evaluate the stats once and store them for the next runs
+      stats = stats.getInfo()
+      for band in bands:
+        cached[band] = (stats[band + '_min_min'], stats[band + '_max_max'])
+        stats_cache.put(keys[band], *cached[band])
+    else:
+      cached = {band: (stats.get(band + '_min_min'), stats.get(band + '_max_max')) for band in bands}
 
-  # normalize the band (0~255)
-  colIm_norm = colIm.map(lambda image: ((image.subtract(minValue)).divide(maxValue.subtract(minValue))).multiply(256).uint8())
+  # constant array images of the min/max values of the bands (in the order of bands)
+  minImage = ee.Image(ee.Array(ee.List([cached[band][0] for band in bands])))
+  maxImage = ee.Image(ee.Array(ee.List([cached[band][1] for band in bands])))
+  rangeImage = maxImage.subtract(minImage)
 
-  # overwrite the same band in the image collection 
-  imgcoll = imgcoll.combine(colIm_norm, overwrite=True)	
+  # normalize all bands at once (0~255) and flatten the array back to the bands
+  def normalize(image):
+    norm_image = image.select(bands).toArray()\
+                  .subtract(minImage)\
+                  .divide(rangeImage)\
+                  .multiply(256)\
+                  .toUint8()\
+                  .arrayFlatten([bands])
+    return ee.Image(norm_image.copyProperties(image, ['system:time_start']))
 
-  return imgcoll
+  return imgcoll.map(normalize)
 
 
 ###################################################################################################################################################
@@ -97,13 +177,13 @@ def create_export_vid_bands_task(vid_collection, folder_name, polygon, vid_name)
   a function to export 3 bands of ee.ImageCollection of a specific polygon to a video
 
   Inputs:
-      - vid_collection: ee.ImageCollection to export from
+      - vid_collection: ee.ImageCollection to export from, its bands must already be UINT8 (e.g. normalized by norm_bands)
       - folder_name:    folder to save videos in, must be placed in /content/drive/MyDrive
       - polygon:        ee.Geometry.Polygon to be exported (lat/long system)
   '''
-  # the export task on the UINT8 version of the video collection to be exported in folder_name folder with a scale of 100 (i.e. 100 meters per pixel)
+  # the export task on the video collection to be exported in folder_name folder with a scale of 100 (i.e. 100 meters per pixel)
   task = ee.batch.Export.video.toDrive(**{
-      'collection': vid_collection.map(lambda img: img.uint8()),
+      'collection': vid_collection,
       'description': vid_name,
       # 'dimensions': 720,
       'scale': 500,
@@ -119,7 +199,77 @@ def create_export_vid_bands_task(vid_collection, folder_name, polygon, vid_name)
 ###################################################################################################################################################
 
 
-def create_export_tasks_for_all_bands(imgcoll, bands, folder_name, polygon, loc_id, lat, lon, start_date, end_date):
+def _list_drive_folder(folder_name):
+  '''
+  a function to list the names of the files in a Google Drive folder with the Drive v3 API (one paginated request instead of a stat per file)
+  it is called once per get_loc_circular_satellite_tasks/get_all_loc_tasks call, so re-runs see the videos exported in between
+  Inputs:
+      - folder_name:    name of the Drive folder
+  '''
+  # only needed when Drive is not mounted, uses the default (e.g. Colab) credentials
+  from googleapiclient.discovery import build
+
+  # escape the folder name for the query string
+  escaped_name = folder_name.replace('\\', '\\\\').replace("'", "\\'")
+
+  service = build('drive', 'v3')
+  folders = service.files().list(q=f"name='{escaped_name}' and mimeType='application/vnd.google-apps.folder' and trashed=false", fields='files(id)').execute()['files']
+
+  names = set()
+  for folder in folders:
+    page_token = None
+    while True:
+      response = service.files().list(q=f"'{folder['id']}' in parents and trashed=false", fields='nextPageToken,files(name)', pageSize=1000, pageToken=page_token).execute()
+      names.update(file['name'] for file in response['files'])
+      page_token = response.get('nextPageToken')
+      if page_token is None:
+        break
+
+  return names
+
+
+def list_existing_videos(folder_name):
+  '''
+  a function to list the names of the files already exported in a folder using a single directory scan
+  if Drive is not mounted on /content/drive, the folder is listed with the Drive API instead
+  Inputs:
+      - folder_name:    folder of the videos, must be placed in /content/drive/MyDrive
+  '''
+  if not os.path.isdir('/content/drive/MyDrive/'):
+    return _list_drive_folder(folder_name)
+
+  folder_path = os.path.join('/content/drive/MyDrive/', folder_name)
+  if not os.path.isdir(folder_path):
+    return set()
+  with os.scandir(folder_path) as entries:
+    return {entry.name for entry in entries}
+
+
+###################################################################################################################################################
+
+
+def _band_chunks(bands):
+  # each 3 bands are exported as a video, a short last chunk is replaced by the last 3 bands
+  return [bands[x:x+3] if x+3 <= len(bands) else bands[-3:] for x in range(0, len(bands), 3)]
+
+
+def _video_name(bands_chunk, loc_id, start_date, end_date):
+  # video name containing bands to be exported
+  vid_name = 'bands:'+str(bands_chunk[0])+','+str(bands_chunk[1])+','+str(bands_chunk[2]) + ';loc:' + str(loc_id) + ';s:' + start_date + ';e:' + end_date
+  vid_name = vid_name.replace("'", "")
+  vid_name = vid_name.replace(".", "")
+  return vid_name
+
+
+def _expected_video_names(bands, loc_id, start_date, end_date):
+  # file names of all videos exported for a location and period
+  return [_video_name(bands_chunk, loc_id, start_date, end_date)+'.mp4' for bands_chunk in _band_chunks(bands)]
+
+
+###################################################################################################################################################
+
+
+def create_export_tasks_for_all_bands(imgcoll, bands, folder_name, polygon, loc_id, lat, lon, start_date, end_date, existing_names=None):
   '''
   a function to export all bands as videos
 
@@ -132,21 +282,21 @@ def create_export_tasks_for_all_bands(imgcoll, bands, folder_name, polygon, loc_
       - lon:            longitude of the center
       - start_date:     start date
       - end_date:       end date
+      - existing_names: set of the file names already in folder_name (see list_existing_videos), scanned if not given
   '''
+  if existing_names is None:
+    existing_names = list_existing_videos(folder_name)
+
   # export each 3 bands as a video
-  chunks = [bands[x:x+3] for x in range(0, len(bands), 3)]
-  chunks[-1] = bands[-3:]
   tasks = []
-  for bands_chunk in chunks:
+  for bands_chunk in _band_chunks(bands):
     # select the 3 bands
     vid_collection = imgcoll.select(bands_chunk)
 
     # video name containing bands to be exported
-    vid_name = 'bands:'+str(bands_chunk[0])+','+str(bands_chunk[1])+','+str(bands_chunk[2]) + ';loc:' + str(loc_id) + ';s:' + start_date + ';e:' + end_date
-    vid_name = vid_name.replace("'", "")
-    vid_name = vid_name.replace(".", "")
+    vid_name = _video_name(bands_chunk, loc_id, start_date, end_date)
 
-    if not os.path.exists(os.path.join('/content/drive/MyDrive/', folder_name, vid_name+'.mp4')):
+    if vid_name+'.mp4' not in existing_names:
       # export the video 
       task = create_export_vid_bands_task(vid_collection, folder_name, polygon, vid_name)  
       tasks.append(task)
@@ -159,28 +309,61 @@ def create_export_tasks_for_all_bands(imgcoll, bands, folder_name, polygon, loc_
 ###################################################################################################################################################
 
 
+def rate_limited(calls, period):
+  '''
+  a decorator to limit a function to at most `calls` calls in every `period` seconds (across threads), sleeping only when the limit is reached
+  Inputs:
+      - calls:  maximum number of calls in a period
+      - period: period length in seconds
+  '''
+  def decorator(func):
+    lock = threading.Lock()
+    call_times = deque()
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+      with lock:
+        now = time.monotonic()
+        # drop the calls that are out of the current window
+        while call_times and now - call_times[0] >= period:
+          call_times.popleft()
+        if len(call_times) >= calls:
+          time.sleep(period - (now - call_times[0]))
+          call_times.popleft()
+        call_times.append(time.monotonic())
+      return func(*args, **kwargs)
+
+    return wrapper
+  return decorator
+
+
+###################################################################################################################################################
+
+
+@rate_limited(calls=10, period=1)
 def start_task(task):
   task.start()
-  time.sleep(0.5) 
   return task
  
 
 ###################################################################################################################################################
 
 
-def start_multiple_tasks(tasks, n):
+def start_multiple_tasks(tasks, n, max_workers=8):
   '''
   a function to run multiple ee tasks at a time
   Inputs:
       - tasks: list of ee.to_drive tasks
       - n: number of tasks to be started
+      - max_workers: maximum number of tasks submitted concurrently
   '''
   to_be_started_tasks = tasks[:min(n, len(tasks))]
   remaining_tasks = tasks[min(n, len(tasks)):]
   
-  for task in to_be_started_tasks: 
-    # start the task and sleep 0.5 sec
-    task = start_task(task)
+  if to_be_started_tasks:
+    # start the tasks concurrently, the submission rate is capped by start_task
+    with ThreadPoolExecutor(max_workers=min(len(to_be_started_tasks), max_workers)) as executor:
+      list(executor.map(start_task, to_be_started_tasks))
   
   return to_be_started_tasks, remaining_tasks
 
@@ -188,42 +371,97 @@ def start_multiple_tasks(tasks, n):
 ###################################################################################################################################################
 
 
-def create_circular_bb_polygon(center, area=100):
+async def _start_task_async(task, semaphore):
+  # ee client calls are blocking, run them in a worker thread so the starts overlap
+  async with semaphore:
+    return await asyncio.to_thread(start_task, task)
+
+
+async def start_multiple_tasks_async(tasks, n, concurrency=16):
   '''
-  a function to sample points from circular polygon around specific lat/long center with a specific radius
+  an asyncio version of start_multiple_tasks, to be awaited (e.g. directly in a notebook cell)
   Inputs:
-      - center: tuple of center lat/long coords of the required polygon 
-      - area: area of the circular polygon in KM-squared
+      - tasks: list of ee.to_drive tasks
+      - n: number of tasks to be started
+      - concurrency: maximum number of tasks being started at the same time
   '''
-  point = Point(center[1], center[0])
+  to_be_started_tasks = tasks[:min(n, len(tasks))]
+  remaining_tasks = tasks[min(n, len(tasks)):]
+
+  semaphore = asyncio.Semaphore(concurrency)
+  await asyncio.gather(*[_start_task_async(task, semaphore) for task in to_be_started_tasks])
+
+  return to_be_started_tasks, remaining_tasks
+
+
+###################################################################################################################################################
+
+
+@lru_cache(maxsize=512)
+def get_aeqd_transformers(lat_0, lon_0):
+  '''
+  a function to get (cached) transformers between WGS84 and a local azimuthal equidistant projection centered at lat_0/lon_0
+  Inputs:
+      - lat_0: latitude of the projection center
+      - lon_0: longitude of the projection center
+  '''
+  local_azimuthal_projection = f"+proj=aeqd +R=6371000 +units=m +lat_0={lat_0} +lon_0={lon_0}"
+
+  wgs84_to_aeqd = Transformer.from_crs('EPSG:4326', local_azimuthal_projection, always_xy=True)
+  aeqd_to_wgs84 = Transformer.from_crs(local_azimuthal_projection, 'EPSG:4326', always_xy=True)
+
+  return wgs84_to_aeqd, aeqd_to_wgs84
+
+
+###################################################################################################################################################
 
-  local_azimuthal_projection = f"+proj=aeqd +R=6371000 +units=m +lat_0={point.y} +lon_0={point.x}"
 
-  wgs84_to_aeqd = partial(
-      pyproj.transform,
-      pyproj.Proj('+proj=longlat +datum=WGS84 +no_defs'),
-      pyproj.Proj(local_azimuthal_projection),
-  )
+@lru_cache(maxsize=4096)
+def get_circular_bb_coords(lat, lon, area):
+  '''
+  a function to get the (cached) coordinates of a circular polygon around specific lat/long center with a specific radius
+  Inputs:
+      - lat: latitude of the center
+      - lon: longitude of the center
+      - area: area of the circular polygon in KM-squared
+  '''
+  point = Point(lon, lat)
 
-  aeqd_to_wgs84 = partial(
-      pyproj.transform,
-      pyproj.Proj(local_azimuthal_projection),
-      pyproj.Proj('+proj=longlat +datum=WGS84 +no_defs'),
-  )
+  # nearby centers (on a 0.1 degree grid) share the same projection
+  wgs84_to_aeqd, aeqd_to_wgs84 = get_aeqd_transformers(round(point.y, 1), round(point.x, 1))
 
-  point_transformed = transform(wgs84_to_aeqd, point)
+  point_transformed = transform(wgs84_to_aeqd.transform, point)
 
   buffer = point_transformed.buffer(area*1000)
 
-  buffer_wgs84 = transform(aeqd_to_wgs84, buffer)
-    
-  return ee.Geometry.Polygon(list(mapping(buffer_wgs84)['coordinates'][0]))
+  buffer_wgs84 = transform(aeqd_to_wgs84.transform, buffer)
+
+  return tuple(mapping(buffer_wgs84)['coordinates'][0])
 
 
 ###################################################################################################################################################
 
 
-def get_loc_circular_satellite_tasks(sat, bands, start_dates, end_dates, loc_id, folder_name, latitude, longitude, polygon_area=100):
+@lru_cache(maxsize=4096)
+def _circular_bb_polygon(lat, lon, area):
+  return ee.Geometry.Polygon(list(get_circular_bb_coords(lat, lon, area)))
+
+
+def create_circular_bb_polygon(center, area=100):
+  '''
+  a function to sample points from circular polygon around specific lat/long center with a specific radius
+  the polygon is cached per center (rounded to 6 decimals) and area, so repeated calls reuse the same ee.Geometry
+  Inputs:
+      - center: tuple of center lat/long coords of the required polygon 
+      - area: area of the circular polygon in KM-squared
+  '''
+  return _circular_bb_polygon(round(center[0], 6), round(center[1], 6), area)
+
+
+###################################################################################################################################################
+
+
+def get_loc_circular_satellite_tasks(sat, bands, start_dates, end_dates, loc_id, folder_name, latitude, longitude, polygon_area=100, stats_cache=None, norm_scale=2000, existing_names=None):
     '''
     a function to get all tasks for a specific location and multiple periods
     Inputs:
@@ -236,42 +474,89 @@ def get_loc_circular_satellite_tasks(sat, bands, start_dates, end_dates, loc_id,
         - latitude:                     latitude of the center
         - longitude:                    longitude of the center
         - polygon_area:                 polygon area in KM^2
+        - stats_cache:                  optional StatsCache of the bands min/max values (the min/max stay lazy in the export graph if not given)
+        - norm_scale:                   scale (in meters) of the min/max reduction used for the normalization
+        - existing_names:               set of the file names already in folder_name (see list_existing_videos), listed if not given
     '''
-    # create polygon around the center
-    polygon = create_circular_bb_polygon((latitude, longitude), area=polygon_area)
-
-    # create folder for the satellite if not exists
+    # create folder for the satellite if not exists (only if Drive is mounted, the export creates it otherwise)
     sat_folder_path = '/content/drive/MyDrive/' + folder_name
-    if not os.path.exists(sat_folder_path):
-        os.mkdir(sat_folder_path)
+    if os.path.isdir('/content/drive/MyDrive/'):
+        os.makedirs(sat_folder_path, exist_ok=True)
+
+    # list the already exported videos once for all periods
+    if existing_names is None:
+        existing_names = list_existing_videos(folder_name)
+
+    # the polygon is only built if some period has videos to be exported
+    polygon = None
+
+    def prepare_image(image, poly_mask):
+        # mask clouds in MODIS/061/MOD09A1
+        if sat == 'MODIS/061/MOD09A1':
+            image = maskCloud(image)
+        # mask all pixels out of polygon
+        return image.updateMask(poly_mask)
 
     tasks = []
     # loop on all periods
     for i in range(len(start_dates)):
         start_date = start_dates[i]
         end_date = end_dates[i]
+
+        # skip the period if all its videos are already exported
+        if set(_expected_video_names(bands, loc_id, start_date, end_date)) <= existing_names:
+            continue
+
+        if polygon is None:
+            # create polygon around the center
+            polygon = create_circular_bb_polygon((latitude, longitude), area=polygon_area)
+            # mask of all pixels out of polygon, built once for all images
+            poly_mask = ee.Image.constant(1).clip(polygon).mask()
+            # image collection of the county, filtered by bounds once for all periods
+            base_imgcoll = ee.ImageCollection(sat).filterBounds(polygon)
         
         # image collection of the county in the needed period
-        imgcoll = ee.ImageCollection(sat)\
-                    .filterDate(start_date,end_date)\
-                    .filterBounds(polygon)
+        imgcoll = base_imgcoll.filterDate(start_date,end_date)
         
-        # mask clouds in MODIS/061/MOD09A1
-        if sat == 'MODIS/061/MOD09A1':
-            imgcoll = imgcoll.map(maskCloud)
+        # mask clouds and pixels out of polygon in a single map
+        imgcoll = imgcoll.map(lambda image: prepare_image(image, poly_mask))
 
-        # mask all pixels out of polygon
-        imgcoll = imgcoll.map(lambda image: image.updateMask(ee.Image.constant(1).clip(polygon).mask()))
+        # normalize (0~255) for the video export, the normalized bands are already UINT8
+        # all export tasks select their chunks from this shared collection of the normalized bands
+        cache_key = (sat, start_date, end_date, latitude, longitude, polygon_area)
+        shared_coll = norm_bands(imgcoll, bands, polygon, stats_cache=stats_cache, cache_key=cache_key, norm_scale=norm_scale)
 
-        # normalize (0~255) for the video export
-        for band in bands:
-            imgcoll = norm_band(imgcoll, band, polygon)
-
-        # convert to uint8
-        imgcoll = imgcoll.map(lambda img: img.uint8())
-        tasks += create_export_tasks_for_all_bands(imgcoll, bands, folder_name, polygon, loc_id, latitude, longitude, start_date, end_date)
+        tasks += create_export_tasks_for_all_bands(shared_coll, bands, folder_name, polygon, loc_id, latitude, longitude, start_date, end_date, existing_names=existing_names)
         
     return tasks
 
 
 ###################################################################################################################################################
+
+
+def get_all_loc_tasks(sat, bands, start_dates, end_dates, locations, folder_name, polygon_area=100, stats_cache=None, norm_scale=2000, max_workers=16):
+    '''
+    a function to get all tasks for multiple locations concurrently (each location is processed by get_loc_circular_satellite_tasks in a thread)
+    Inputs:
+        - sat:                          satellite code
+        - bands:                        a list of the names of bands to be exported from the satellite database
+        - start_dates:                  list of start dates
+        - end_dates:                    list of end dates
+        - locations:                    iterable of (loc_id, latitude, longitude) tuples
+        - folder_name:                  folder to save videos in, must be placed in /content/drive/MyDrive
+        - polygon_area:                 polygon area in KM^2
+        - stats_cache:                  optional StatsCache of the bands min/max values shared by all locations
+        - norm_scale:                   scale (in meters) of the min/max reduction used for the normalization
+        - max_workers:                  maximum number of locations processed at the same time
+    '''
+    # list the already exported videos once for all locations
+    existing_names = list_existing_videos(folder_name)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(get_loc_circular_satellite_tasks, sat, bands, start_dates, end_dates, loc_id, folder_name, latitude, longitude, polygon_area, stats_cache, norm_scale, existing_names)
+                   for loc_id, latitude, longitude in locations]
+        # keep the tasks in the order of the locations
+        return list(chain.from_iterable(future.result() for future in futures))
+
+
+###################################################################################################################################################